@@ -0,0 +1,9 @@
+from .base import Backend, SYNC_CACHE_DIR, write_private_json
+from .nextcloud import NextcloudBackend
+from .radicale import RadicaleBackend
+
+# Selectable with --backend on the command line
+BACKENDS = {
+    'nextcloud': NextcloudBackend,
+    'radicale': RadicaleBackend,
+}
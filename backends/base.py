@@ -0,0 +1,332 @@
+import json
+from abc import ABC, abstractmethod
+import logging
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from icalendar import Calendar
+from zoneinfo import ZoneInfo
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+REQUEST_TIMEOUT = (5, 30)  # (connect, read) seconds for CalDAV requests
+
+# Local state kept between runs: per-collection sync tokens and the saved Kronos session
+SYNC_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'schedule-sync')
+_SYNC_CACHE_VERSION = 2  # Bump when the cache layout changes; other versions trigger a full resync
+
+# WebDAV sync-collection REPORT (RFC 6578); an empty token asks for the full listing
+_SYNC_COLLECTION = """<?xml version="1.0" encoding="utf-8"?>
+<D:sync-collection xmlns:D="DAV:" xmlns:C="urn:ietf:params:xml:ns:caldav">
+  <D:sync-token>{sync_token}</D:sync-token>
+  <D:sync-level>1</D:sync-level>
+  <D:prop>
+    <D:getetag/>
+    <C:calendar-data/>
+  </D:prop>
+</D:sync-collection>"""
+
+_CALENDAR_DATA = './/{urn:ietf:params:xml:ns:caldav}calendar-data'  # Found anywhere under a multistatus <response>
+
+# RFC 5545 line folding: a line break followed by a single space or tab continues the line
+_FOLD_RE = re.compile(r'\r?\n[ \t]')
+_LINE_BREAK_RE = re.compile(r'\r?\n')  # Unlike str.splitlines(), leaves U+2028 and friends inside values
+_TEXT_UNESCAPE_RE = re.compile(r'\\([\\;,nN])')
+_DATE_TIME_RE = re.compile(r'(\d{4})(\d{2})(\d{2})(?:T(\d{2})(\d{2})(\d{2})(Z?))?$')
+
+class Backend(ABC):
+    """A calendar server the scraped schedule is synced into."""
+    name = "calendar"
+    summary_style = 'times'  # See create_icalendar_event in sync.py
+
+    @abstractmethod
+    def fetch_existing(self, start, end):
+        """Return a dict keyed by (dtstart, dtend, summary) for the events overlapping [start, end)."""
+
+    @abstractmethod
+    def upload(self, ics_events):
+        """Create each generated {'uid', 'ics', 'key'} event on the server."""
+
+def _ical_datetime(params, value):
+    """Decode a DATE or DATE-TIME value (UTC, TZID or floating) like icalendar's .dt."""
+    year, month, day, hour, minute, second, utc = _DATE_TIME_RE.match(value).groups()
+    if hour is None:
+        return date(int(year), int(month), int(day))
+    dt = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    if utc:
+        return dt.replace(tzinfo=timezone.utc)
+    if 'TZID' in params:
+        return dt.replace(tzinfo=ZoneInfo(params['TZID']))
+    return dt
+
+def _fast_event_keys(ics_data):
+    """Read DTSTART/DTEND/SUMMARY of a single-VEVENT calendar with a line scan.
+
+    Returns None for anything outside that simple shape so the caller can use icalendar instead.
+    """
+    start = ics_data.find('BEGIN:VEVENT')
+    end = ics_data.find('END:VEVENT', start)
+    if start < 0 or end < 0 or ics_data.find('BEGIN:VEVENT', end) >= 0:
+        return None
+    vevent = ics_data[start:end + len('END:VEVENT')]
+
+    props = {}
+    depth = 0  # Skip properties of nested components such as VALARM
+    for line in _LINE_BREAK_RE.split(_FOLD_RE.sub('', vevent))[1:-1]:
+        if line.startswith('BEGIN:'):
+            depth += 1
+        elif line.startswith('END:'):
+            depth -= 1
+        elif not depth:
+            name_params, sep, value = line.partition(':')
+            if not sep or '"' in name_params:
+                return None  # Quoted parameter values may contain ':'
+            name, *params = name_params.split(';')
+            # Property and parameter names are case-insensitive (RFC 5545 section 2)
+            param_pairs = (param.partition('=') for param in params)
+            props[name.upper()] = ({key.upper(): param_value for key, _, param_value in param_pairs}, value)
+
+    if 'DTSTART' not in props or 'DTEND' not in props:
+        return None
+    dtstart = _ical_datetime(*props['DTSTART'])
+    dtend = _ical_datetime(*props['DTEND'])
+    summary = props.get('SUMMARY')
+    if summary is not None:
+        summary = _TEXT_UNESCAPE_RE.sub(lambda m: '\n' if m.group(1) in 'nN' else m.group(1), summary[1])
+    return {(dtstart, dtend, summary): vevent}
+
+def event_keys_from_ical(ics_data):
+    """Parse calendar data into {(dtstart, dtend, summary): vevent_ics} entries."""
+    if isinstance(ics_data, bytes):
+        ics_data = ics_data.decode('utf-8')
+
+    # Most server events are one plain VEVENT; only build the full icalendar tree when they aren't
+    try:
+        event_keys = _fast_event_keys(ics_data)
+    except (ValueError, KeyError, AttributeError):
+        event_keys = None
+
+    if event_keys is None:
+        event_keys = {}
+        cal = Calendar.from_ical(ics_data)
+        for component in cal.walk('VEVENT'):
+            dtstart = component.get('dtstart').dt
+            dtend = component.get('dtend').dt
+            summary = component.get('summary')
+            event_keys[(dtstart, dtend, summary)] = component.to_ical().decode('utf-8')
+
+    for dtstart, dtend, summary in event_keys:
+        logging.debug("Event found: %s from %s to %s", summary, dtstart, dtend)
+    return event_keys
+
+def _iter_multistatus(response):
+    """Yield the <response> and <sync-token> elements of a streamed 207 multistatus body.
+
+    Each <response> is parsed as it arrives and cleared once the caller moves on, so memory stays flat.
+    """
+    response.raw.decode_content = True  # Undo any gzip Content-Encoding while reading raw
+    for _, elem in ET.iterparse(response.raw, events=('end',)):
+        if elem.tag in ('{DAV:}response', '{DAV:}sync-token'):
+            yield elem
+            elem.clear()
+
+def _sync_report(session, collection_url, sync_token):
+    """Run a sync-collection REPORT, returning (new_token, {href: calendar_data}, removed_hrefs).
+
+    Returns None when the server rejects the token or doesn't support the report.
+    """
+    with session.request(
+        'REPORT',
+        collection_url,
+        data=_SYNC_COLLECTION.format(sync_token=escape(sync_token)).encode('utf-8'),
+        headers={"Content-Type": "application/xml; charset=utf-8"},
+        timeout=REQUEST_TIMEOUT,
+        stream=True
+    ) as response:
+        if response.status_code != 207:
+            logging.info(f"sync-collection REPORT not usable: {response.status_code}")
+            return None
+
+        changed, removed, new_token = {}, [], None
+        for elem in _iter_multistatus(response):
+            if elem.tag == '{DAV:}sync-token':
+                new_token = elem.text
+                continue
+            href = elem.findtext('{DAV:}href')
+            status = elem.findtext('{DAV:}status') or ''
+            if ' 404 ' in status:
+                removed.append(href)
+            else:
+                calendar_data = elem.findtext(_CALENDAR_DATA)
+                if calendar_data is None:
+                    logging.info(f"sync-collection response for {href} carried no calendar data")
+                    return None
+                changed[href] = calendar_data
+    return new_token, changed, removed
+
+def write_private_json(path, data):
+    """Atomically replace path with data as JSON, readable only by the current user."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # mkstemp gives each write its own 0600 file, so concurrent saves can't clobber each other's temp file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _save_sync_cache(cache_path, collection_url, sync_token, events):
+    """Write the sync cache for the next run; failures only cost a resync."""
+    cache = {
+        'version': _SYNC_CACHE_VERSION,
+        'url': collection_url,
+        'sync_token': sync_token,
+        'events': {href: _serialize_keys(event_keys) for href, event_keys in events.items()}
+    }
+    try:
+        write_private_json(cache_path, cache)
+    except OSError as e:
+        logging.warning(f"Could not save the sync cache to {cache_path}: {e}")
+
+def _load_sync_cache(cache_path, collection_url):
+    """Return (sync_token, {href: [event_key, ...]}), or None when the cache is missing, stale or malformed."""
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+        if cache.get('version') != _SYNC_CACHE_VERSION or cache.get('url') != collection_url:
+            return None
+        sync_token = cache['sync_token']
+        if not isinstance(sync_token, str):
+            return None
+        events = {
+            href: [(_deserialize_value(dtstart), _deserialize_value(dtend), summary) for dtstart, dtend, summary in event_keys]
+            for href, event_keys in cache['events'].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    return sync_token, events
+
+def _serialize_keys(event_keys):
+    """Event keys as JSON-friendly [dtstart, dtend, summary] lists with ISO-8601 date/datetime strings."""
+    return [[dtstart.isoformat(), dtend.isoformat(), summary and str(summary)] for dtstart, dtend, summary in event_keys]
+
+def _deserialize_value(value):
+    """Inverse of isoformat() for the DATE and DATE-TIME values stored by _serialize_keys."""
+    return date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+
+def _is_aware(value):
+    """Whether value is a datetime with a time zone, i.e. comparable to the sync window."""
+    return isinstance(value, datetime) and value.tzinfo is not None
+
+def _overlaps(dtstart, dtend, start, end):
+    """Whether an event touches [start, end); floating and all-day events can't be compared, so are kept."""
+    if not (_is_aware(dtstart) and _is_aware(dtend)):
+        return True
+    return dtstart < end and dtend > start
+
+def sync_collection(session, collection_url, cache_name, start, end):
+    """Return {(dtstart, dtend, summary): href} for events overlapping [start, end), downloading only what changed.
+
+    The sync token and each resource's parsed event keys are kept in SYNC_CACHE_DIR, so only
+    changed resources are parsed. An expired token or unreadable cache triggers a full resync;
+    None is returned (and the cache dropped) when the server doesn't support sync-collection at all.
+    """
+    cache_path = os.path.join(SYNC_CACHE_DIR, f"{cache_name}.json")
+    cache = _load_sync_cache(cache_path, collection_url)
+
+    result = None
+    if cache:
+        sync_token, events = cache
+        result = _sync_report(session, collection_url, sync_token)
+        if result is None:
+            logging.info("Cached sync token was not accepted, doing a full resync")
+    if result is None:
+        sync_token, events = '', {}
+        result = _sync_report(session, collection_url, '')
+        if result is None:
+            # Don't let a stale cache cost an extra REPORT on every later run
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+            return None
+
+    new_token, changed, removed = result
+    logging.info(f"sync-collection reported {len(changed)} changed and {len(removed)} removed events")
+    for href in removed:
+        events.pop(href, None)
+    for href, calendar_data in changed.items():
+        try:
+            events[href] = list(event_keys_from_ical(calendar_data))
+        except Exception as e:
+            logging.error(f"Error parsing event: {e}")
+            events[href] = []
+    # Nothing to write when the server reported no changes
+    if new_token and (changed or removed or new_token != sync_token):
+        _save_sync_cache(cache_path, collection_url, new_token, events)
+
+    existing_events = {}
+    for href, event_keys in events.items():
+        for dtstart, dtend, summary in event_keys:
+            if _overlaps(dtstart, dtend, start, end):
+                existing_events[(dtstart, dtend, summary)] = href
+    return existing_events
+
+def make_session(workers, content_type):
+    """A pooled session for a backend's CalDAV requests, sized for its upload workers.
+
+    urllib3 backs off on 429 and 5xx responses, honouring the server's Retry-After header.
+    Backends set the credentials in __init__ so they are read when the backend is created.
+    """
+    session = requests.Session()
+    session.headers.update({"Content-Type": content_type})
+    adapter = HTTPAdapter(
+        pool_connections=workers,
+        pool_maxsize=workers,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def put_events(session, bucket, collection_url, ics_events, workers, server_name):
+    """PUT each event into collection_url as its own resource, overlapping the round-trips."""
+    def put_one(ics_event):
+        uid = ics_event['uid']
+        try:
+            bucket.consume()
+            # Only create the resource if this UID isn't already on the server
+            response = session.put(
+                f"{collection_url}{uid}.ics",
+                data=ics_event['ics'],
+                headers={"If-None-Match": "*"},
+                timeout=REQUEST_TIMEOUT
+            )
+
+            if response.status_code in (201, 204):
+                logging.info(f"Successfully uploaded {uid} to {server_name}")
+            elif response.status_code == 412:
+                logging.info(f"Event {uid} already exists on {server_name}, skipping")
+            else:
+                logging.error(f"Failed to upload {uid} to {server_name}: {response.status_code} - {response.text}")
+        except Exception as e:
+            logging.error(f"Failed to upload {uid} to {server_name}: {e}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(put_one, ics_events))
@@ -0,0 +1,82 @@
+import functools
+import logging
+from caldav import DAVClient
+from ratelimit import TokenBucket
+from .base import Backend, event_keys_from_ical, make_session, put_events, sync_collection
+
+# Constants
+NEXTCLOUD_URL = ""
+NEXTCLOUD_USERNAME = ""
+NEXTCLOUD_PASSWORD = ""
+UPLOAD_WORKERS = 8
+UPLOAD_RATE_LIMIT = 10  # Requests per second sent to Nextcloud
+
+# Shared HTTP session for raw CalDAV PUTs so uploads reuse pooled connections
+_SESSION = make_session(UPLOAD_WORKERS, "text/calendar; charset=utf-8")
+_UPLOAD_BUCKET = TokenBucket(capacity=UPLOAD_RATE_LIMIT, refill_rate=UPLOAD_RATE_LIMIT)
+
+def _collection_url(calendar):
+    """The calendar's collection URL with a trailing slash, ready to append resource names."""
+    calendar_url = str(calendar.url)
+    if not calendar_url.endswith('/'):
+        calendar_url += '/'
+    return calendar_url
+
+class NextcloudBackend(Backend):
+    """Sync into the 'personal' calendar on Nextcloud over CalDAV."""
+    name = "Nextcloud"
+
+    def __init__(self):
+        self.client = DAVClient(NEXTCLOUD_URL, username=NEXTCLOUD_USERNAME, password=NEXTCLOUD_PASSWORD)
+        _SESSION.auth = (NEXTCLOUD_USERNAME, NEXTCLOUD_PASSWORD)
+
+    @functools.cached_property
+    def calendar(self):
+        """The 'personal' calendar, discovered once; fetch and upload reuse the same collection.
+
+        Resolved on first use rather than in __init__ so the PROPFIND overlaps the Kronos scrape.
+        """
+        calendars = self.client.principal().calendars()
+
+        logging.info("Available calendars:")
+        for cal in calendars:
+            logging.info(f"- {cal.name}")
+        for cal in calendars:
+            if cal.name.lower() == 'personal'.lower():  # Case-insensitive comparison
+                return cal
+        return None
+
+    def fetch_existing(self, start, end):
+        """Retrieve existing events from the 'personal' calendar.
+
+        Uses the cached sync-collection state when the server supports it, otherwise a
+        time-range calendar-query REPORT for [start, end).
+        """
+        existing_events = {}
+        calendar = self.calendar
+        if calendar:
+            logging.info(f"Retrieving events from calendar: {calendar.name}")
+            synced_events = sync_collection(_SESSION, _collection_url(calendar), 'nextcloud', start, end)
+            if synced_events is not None:
+                existing_events = synced_events
+            else:
+                events = calendar.search(start=start, end=end, event=True, expand=False)
+                logging.info(f"Found {len(events)} events in 'personal' calendar.")
+                for event in events:
+                    try:
+                        existing_events.update(event_keys_from_ical(event.data))
+                    except Exception as e:
+                        logging.error(f"Error parsing event: {e}")
+
+        logging.info(f"Retrieved {len(existing_events)} existing events from the 'personal' calendar.")
+        return existing_events
+
+    def upload(self, ics_events):
+        """Upload generated events to the 'personal' calendar with concurrent CalDAV PUTs."""
+        calendar = self.calendar  # Already discovered while fetching existing events
+        if not calendar:
+            logging.error("The 'personal' calendar was not found during upload.")
+            return
+
+        # caldav is only used to discover the collection; the PUTs go straight through the pooled session
+        put_events(_SESSION, _UPLOAD_BUCKET, _collection_url(calendar), ics_events, UPLOAD_WORKERS, self.name)
@@ -0,0 +1,87 @@
+import logging
+from datetime import timezone
+from ratelimit import TokenBucket
+from .base import _CALENDAR_DATA, REQUEST_TIMEOUT, Backend, _iter_multistatus, event_keys_from_ical, make_session, put_events, sync_collection
+
+# Constants
+RADICALE_WEBDAV_URL = ""
+RADICALE_USERNAME = ""
+RADICALE_PASSWORD = ""
+UPLOAD_WORKERS = 16
+UPLOAD_RATE_LIMIT = 10  # Requests per second sent to Radicale
+
+# Shared HTTP session so uploads reuse pooled connections instead of a new TLS handshake per PUT
+_SESSION = make_session(UPLOAD_WORKERS, "text/calendar")
+_UPLOAD_BUCKET = TokenBucket(capacity=UPLOAD_RATE_LIMIT, refill_rate=UPLOAD_RATE_LIMIT)
+
+# CalDAV calendar-query limited to VEVENTs overlapping a time range (RFC 4791 section 7.8)
+_CALENDAR_QUERY = """<?xml version="1.0" encoding="utf-8"?>
+<C:calendar-query xmlns:D="DAV:" xmlns:C="urn:ietf:params:xml:ns:caldav">
+  <D:prop>
+    <D:getetag/>
+    <C:calendar-data/>
+  </D:prop>
+  <C:filter>
+    <C:comp-filter name="VCALENDAR">
+      <C:comp-filter name="VEVENT">
+        <C:time-range start="{start}" end="{end}"/>
+      </C:comp-filter>
+    </C:comp-filter>
+  </C:filter>
+</C:calendar-query>"""
+
+def _calendar_query(start, end):
+    """Yield the calendar data of events overlapping [start, end) from a CalDAV calendar-query REPORT.
+
+    The multistatus body is parsed as it streams in, one <response> element at a time.
+    """
+    body = _CALENDAR_QUERY.format(
+        start=start.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ'),
+        end=end.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    )
+    with _SESSION.request(
+        'REPORT',
+        RADICALE_WEBDAV_URL,
+        data=body.encode('utf-8'),
+        headers={"Depth": "1", "Content-Type": "application/xml; charset=utf-8"},
+        timeout=REQUEST_TIMEOUT,
+        stream=True
+    ) as response:
+        if response.status_code != 207:
+            logging.error(f"Failed to retrieve existing events: {response.status_code} - {response.text}")
+            return
+
+        # The server returns only the matching events, each with its calendar data inline
+        for elem in _iter_multistatus(response):
+            calendar_data = elem.findtext(_CALENDAR_DATA)
+            if calendar_data is not None:
+                yield calendar_data
+
+class RadicaleBackend(Backend):
+    """Sync into a Radicale calendar collection over WebDAV."""
+    name = "Radicale"
+    summary_style = 'details'  # Existing Radicale events use the bare shift details as their summary
+
+    def __init__(self):
+        _SESSION.auth = (RADICALE_USERNAME, RADICALE_PASSWORD)
+
+    def fetch_existing(self, start, end):
+        """Retrieve existing Radicale events.
+
+        Uses the cached sync-collection state when available, otherwise a time-range
+        calendar-query REPORT for [start, end).
+        """
+        existing_events = sync_collection(_SESSION, RADICALE_WEBDAV_URL, 'radicale', start, end)
+        if existing_events is None:
+            existing_events = {}
+            for ics_data in _calendar_query(start, end):
+                try:
+                    existing_events.update(event_keys_from_ical(ics_data))
+                except Exception as e:
+                    logging.error(f"Error parsing event: {e}")
+        logging.info(f"Retrieved {len(existing_events)} existing events from Radicale.")
+        return existing_events
+
+    def upload(self, ics_events):
+        """Upload individual events to Radicale concurrently."""
+        put_events(_SESSION, _UPLOAD_BUCKET, RADICALE_WEBDAV_URL, ics_events, UPLOAD_WORKERS, self.name)
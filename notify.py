@@ -1,4 +1,38 @@
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ratelimit import TokenBucket, retry_after_seconds
+
+# Persistent session so repeated sends reuse the TLS connection to api.telegram.org
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=4,
+    # Only retry failed connects: sendMessage isn't idempotent, so a read error or 5xx may
+    # already have posted the message. 429s are retried in send_telegram_message.
+    max_retries=Retry(
+        total=3,
+        connect=3,
+        read=0,
+        backoff_factor=0.5,
+        raise_on_status=False
+    )
+))
+REQUEST_TIMEOUT = (3, 10)  # (connect, read) seconds
+
+# Telegram allows ~30 messages/s overall and ~1 message/s per chat
+_GLOBAL_BUCKET = TokenBucket(capacity=30, refill_rate=30)
+_CHAT_BUCKETS = {}
+_CHAT_BUCKETS_LOCK = threading.Lock()
+MAX_ATTEMPTS = 5
+
+def _chat_bucket(chat_id):
+    with _CHAT_BUCKETS_LOCK:
+        if chat_id not in _CHAT_BUCKETS:
+            _CHAT_BUCKETS[chat_id] = TokenBucket(capacity=1, refill_rate=1)
+        return _CHAT_BUCKETS[chat_id]
 
 def send_telegram_message(message, chat_id, bot_token):
     url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
@@ -6,9 +40,20 @@ def send_telegram_message(message, chat_id, bot_token):
         "chat_id": chat_id,
         "text": message,
     }
-    response = requests.post(url, data=data)
+    for attempt in range(MAX_ATTEMPTS):
+        _GLOBAL_BUCKET.consume()
+        _chat_bucket(chat_id).consume()
+        response = _SESSION.post(url, data=data, timeout=REQUEST_TIMEOUT)
+        if response.status_code != 429 or attempt == MAX_ATTEMPTS - 1:
+            break
+        # Rate limited: wait the advertised interval before trying again
+        time.sleep(retry_after_seconds(response))
     return response.status_code, response.text
 
+def send_many(messages, chat_id, bot_token):
+    """Send several messages to one chat in order; the per-chat limit makes this as fast as a pool."""
+    return [send_telegram_message(message, chat_id, bot_token) for message in messages]
+
 if __name__ == "__main__":
     # Example values, replace these with your actual values
     bot_token = "YOUR_BOT_TOKEN"
@@ -0,0 +1,39 @@
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket used to throttle outgoing HTTP requests."""
+
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate  # Tokens added per second
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, tokens=1):
+        """Block until the requested number of tokens is available, then take them."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+                self.last_refill = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.refill_rate
+            time.sleep(wait)  # Sleep outside the lock so other threads can refill/check
+
+def retry_after_seconds(response, default=1):
+    """Return how long the server asked us to wait after a 429 response."""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after is not None:
+        try:
+            return max(0, int(retry_after))
+        except ValueError:
+            pass
+    # Telegram also reports the wait in the JSON body
+    try:
+        return int(response.json().get('parameters', {}).get('retry_after', default))
+    except ValueError:
+        return default
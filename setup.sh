@@ -21,10 +21,10 @@ pip install -r requirements.txt
 
 # Ensure script is executable
 echo "Making the schedule sync script executable..."
-chmod +x sync_nextcloud.py && chmod +x sync_radicale.py
+chmod +x sync.py
 
 # Deactivate virtual environment
 echo "Deactivating virtual environment..."
 deactivate
 
-echo "Setup complete. To run the script, activate the virtual environment using 'source venv/bin/activate' and run 'python schedule_sync.py'."
+echo "Setup complete. To run the script, activate the virtual environment using 'source venv/bin/activate' and run 'python -m sync --backend=nextcloud' (or --backend=radicale)."
@@ -0,0 +1,613 @@
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.common.exceptions import TimeoutException
+import lxml.html
+import pyotp
+import functools
+import itertools
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import hashlib
+import requests
+import traceback
+from backends import BACKENDS, SYNC_CACHE_DIR, write_private_json
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("schedule_sync.log"),
+        logging.StreamHandler()
+    ]
+)
+# Third-party libraries log every WebDriver command and HTTP request at INFO/DEBUG
+for noisy in ("selenium", "urllib3", "caldav"):
+    logging.getLogger(noisy).setLevel(logging.WARNING)
+
+# Constants
+MICROSOFT_LOGIN_URL = ""
+KRONOS_URL = ""
+KRONOS_EXTRA_URLS = []  # Additional schedule pages (other weeks/users) scraped alongside KRONOS_URL
+SCRAPE_WORKERS = 4  # Schedule pages fetched over HTTP at once
+SELENIUM_GRID_URL = ""  # e.g. "http://grid-hub:4444/wd/hub"; empty runs Chrome locally
+KRONOS_COOKIE_FILE = os.path.join(SYNC_CACHE_DIR, "kronos_cookies.json")
+CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH", "")  # Pinned chromedriver; empty lets Selenium Manager find one
+USERNAME = ""
+PASSWORD = ""
+TOTP_SECRET = ""
+UID_DOMAIN = "@mydomain.com"  # Suffix appended to generated event UIDs
+# Existing events are fetched for this window around today, concurrently with scraping
+SYNC_WINDOW_PAST_DAYS = 14
+SYNC_WINDOW_FUTURE_DAYS = 90
+
+# Shift times are shown in US Eastern time
+_LOCAL_TZ = ZoneInfo('America/New_York')
+
+# Fixed-shape VCALENDAR written directly instead of building icalendar objects
+_ICS_TEMPLATE = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//schedule-sync//EN\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:{uid}\r\n"
+    "DTSTAMP:{dtstamp}\r\n"
+    "DTSTART;TZID={tzid}:{dtstart}\r\n"
+    "DTEND;TZID={tzid}:{dtend}\r\n"
+    "{summary_line}\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+_ICS_ESCAPE = str.maketrans({'\\': '\\\\', ';': '\\;', ',': '\\,', '\n': '\\n'})
+_ICS_LINE_LIMIT = 75  # Octets per content line before folding (RFC 5545 section 3.1)
+
+# Start time, end time and optional shift length, e.g. "9:00 AM - 5:30 PM 8.5"
+_TIME_RE = re.compile(r'(\d{1,2}:\d{2}\s*[AP]M)\s*-\s*(\d{1,2}:\d{2}\s*[AP]M)\s*(\d+\.\d+)?')
+# Bracketed annotations Kronos appends to shift time ranges
+_BRACKET_RE = re.compile(r'\s*\[.*?\]')
+
+# Month abbreviations as they appear in the Kronos day "datetime" attribute
+_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
+}
+_CLOCK_RE = re.compile(r'(\d{1,2}):(\d{2})\s*([AP]M)')
+
+# Elements whose text the browser's innerText leaves out, and those that start a new line
+_HIDDEN_TAGS = frozenset({'script', 'style', 'noscript', 'template', 'head', 'title'})
+_BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset', 'figcaption',
+    'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main',
+    'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul'
+})
+_WHITESPACE_RE = re.compile(r'[ \t\r\n\f]+')
+
+# Collects each day's date plus the time/label text of its shifts in one execute_script call
+_SCHEDULE_JS = """
+return Array.from(document.querySelectorAll('li.withDivider')).map(day => ({
+    date: day.getAttribute('datetime'),
+    shifts: Array.from(day.querySelectorAll('div.scheduleEntityWrapper, div.shiftPosition')).map(shift => {
+        const time = shift.querySelector('p.props, time.label');
+        const label = shift.querySelector('p.label, div.details');
+        return {time: time ? time.innerText : null, details: label ? label.innerText : null};
+    })
+}));
+"""
+
+@functools.cache
+def _totp():
+    """Build the TOTP generator once, on first use."""
+    return pyotp.TOTP(TOTP_SECRET)
+
+def capture_screenshot(driver, name):
+    """Capture a screenshot for debugging."""
+    screenshot_dir = "screenshots"
+    os.makedirs(screenshot_dir, exist_ok=True)
+    screenshot_path = os.path.join(screenshot_dir, f"{name}.png")
+    driver.save_screenshot(screenshot_path)
+    logging.info(f"Screenshot saved to {screenshot_path}")
+
+def log_page_details(driver):
+    """Log current page details for debugging."""
+    logging.info(f"Current URL: {driver.current_url}")
+    logging.info(f"Page Title: {driver.title}")
+    capture_screenshot(driver, "current_page")
+
+def safe_click(driver, by, value, retries=5):
+    for attempt in range(retries):
+        try:
+            logging.info(f"Attempting to click element with {by}='{value}', attempt {attempt + 1} of {retries}")
+            element = WebDriverWait(driver, 20, poll_frequency=0.2).until(
+                EC.element_to_be_clickable((by, value))
+            )
+            driver.execute_script("arguments[0].click();", element)
+            logging.info(f"Successfully clicked element with {by}='{value}'")
+            return
+        except Exception as e:
+            logging.warning(f"Retrying click due to: {e} (Attempt {attempt + 1} of {retries})")
+            logging.info(f"Current URL: {driver.current_url}")
+    raise Exception(f"Failed to click element with {by}='{value}' after {retries} retries")
+
+def login_to_microsoft(driver):
+    logging.info("Starting Microsoft login process")
+    logging.info(f"Microsoft Login URL: {MICROSOFT_LOGIN_URL}")
+    driver.get(MICROSOFT_LOGIN_URL)
+
+    # Enter the username and submit once the login form has rendered
+    WebDriverWait(driver, 20, poll_frequency=0.25).until(EC.presence_of_element_located((By.NAME, "loginfmt"))).send_keys(USERNAME)
+    safe_click(driver, By.ID, "idSIButton9")
+
+    # Wait for the password field to be present and visible before inputting password
+    password_field = WebDriverWait(driver, 20).until(
+        EC.visibility_of_element_located((By.NAME, "passwd"))
+    )
+    
+    # Explicitly focus on the password field and input the password
+    password_field.click()
+    password_field.send_keys(PASSWORD)
+    
+    logging.info("Password entered successfully")
+    safe_click(driver, By.ID, "idSIButton9")
+    
+    # Generate the TOTP
+    code = _totp().now()
+    
+    # Enter the TOTP code
+    totp_field = WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.NAME, "otc")))
+    totp_field.send_keys(code)
+    
+    logging.info("TOTP code entered successfully")
+    
+    # Wait for and click the submit button
+    safe_click(driver, By.ID, "idSubmit_SAOTCC_Continue")
+    
+    # Wait for possible redirection to Kronos
+    try:
+        WebDriverWait(driver, 10).until(EC.url_contains(KRONOS_URL))
+        logging.info("Successfully redirected to Kronos")
+    except Exception as e:
+        logging.warning(f"Redirection to Kronos failed: {e}")
+        # Fallback: Manually navigate to the Kronos URL
+        logging.info("Attempting manual navigation to Kronos")
+        driver.get(KRONOS_URL)
+        try:
+            # Resolve as soon as the browser lands on Kronos instead of waiting out a fixed delay
+            WebDriverWait(driver, 20, poll_frequency=0.25).until(EC.url_contains(KRONOS_URL))
+        except TimeoutException:
+            pass  # Reported below
+        log_page_details(driver)
+        # Verify if we are on the Kronos site
+        if KRONOS_URL in driver.current_url:
+            logging.info("Manual navigation to Kronos successful")
+        else:
+            logging.error("Manual navigation to Kronos failed. Current URL: " + driver.current_url)
+            capture_screenshot(driver, "failed_navigation")
+
+def scrape_schedule(driver, url=None):
+    url = url or KRONOS_URL
+    logging.info("Starting to scrape the schedule")
+    logging.info(f"Kronos URL: {url}")
+
+    try:
+        # Navigate to the Kronos schedule page
+        driver.get(url)
+        logging.info("Navigated to Kronos schedule page.")
+        log_page_details(driver)  # Log current page details and capture a screenshot
+
+        # Wait for the day elements (li elements with class 'withDivider') to render
+        WebDriverWait(driver, 40).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li.withDivider"))
+        )
+        # Pull every day and shift out of the DOM in a single WebDriver round-trip
+        schedule_days = driver.execute_script(_SCHEDULE_JS)
+        logging.info(f"Located {len(schedule_days)} schedule day elements.")
+
+        return parse_schedule_days(schedule_days)
+
+    except TimeoutException as e:
+        logging.error("Timeout while waiting for schedule elements.")
+        capture_screenshot(driver, "timeout_error")
+        # Save the page source for inspection
+        with open("page_source_error.html", "w", encoding="utf-8") as f:
+            f.write(driver.page_source)
+        logging.error(f"Page source saved to page_source_error.html")
+        logging.error(f"Full traceback: {traceback.format_exc()}")
+        return []
+
+    except Exception as e:
+        logging.error(f"An error occurred: {str(e)}")
+        logging.error(f"Full traceback: {traceback.format_exc()}")
+        return []
+
+def parse_schedule_days(schedule_days):
+    """Turn raw [{date, shifts: [{time, details}]}] day data into deduplicated schedule entries."""
+    # Keyed by shift so deduplication and storage share one structure
+    schedule_data = {}
+
+    # Iterate over each day to find shifts
+    for day in schedule_days:
+        try:
+            day_date = day["date"]
+            logging.debug("Processing schedule for date: %s", day_date)
+
+            shift_wrappers = day["shifts"]
+            logging.debug("Found %d shifts for date: %s", len(shift_wrappers), day_date)
+
+            for shift in shift_wrappers:
+                try:
+                    time_range = shift["time"]
+                    if time_range is None:
+                        logging.warning("No time element found for shift on date %s. Skipping shift.", day_date)
+                        continue  # Skip this shift if no time element is found
+
+                    # Use regex to extract start time, end time, and shift length
+                    match = _TIME_RE.search(time_range)
+                    if match:
+                        start_time_str = match.group(1)
+                        end_time_str = match.group(2)
+                        shift_length = match.group(3)
+                    else:
+                        logging.warning("Could not parse time range: %s", time_range)
+                        continue  # Skip this shift
+
+                    shift_details = shift["details"]
+                    if shift_details is None:
+                        shift_details = "No details available"
+
+                    # Create a unique key for the shift
+                    shift_key = (day_date, start_time_str, end_time_str, shift_details, shift_length)
+
+                    record = {
+                        "date": day_date,
+                        "start_time": start_time_str,
+                        "end_time": end_time_str,
+                        "details": shift_details,
+                        "shift_length": shift_length,
+                        "time_range": _BRACKET_RE.sub('', time_range)  # Seeds the UID of 'details' style events
+                    }
+
+                    # Check if the shift has already been processed
+                    if schedule_data.setdefault(shift_key, record) is not record:
+                        logging.debug("Duplicate shift found for date %s: %s-%s, %s. Skipping.", day_date, start_time_str, end_time_str, shift_details)
+                        continue  # Skip adding this shift as it's a duplicate
+
+                    logging.debug("Shift details: %s-%s (%s hrs), %s", start_time_str, end_time_str, shift_length, shift_details)
+                except Exception as e:
+                    logging.error(f"Error scraping shift details for date {day_date}: {str(e)}")
+                    logging.error(f"Full traceback: {traceback.format_exc()}")
+        except Exception as e:
+            logging.error(f"Error scraping shifts for date {day_date}: {str(e)}")
+            logging.error(f"Full traceback: {traceback.format_exc()}")
+
+    schedule_data = list(schedule_data.values())
+    logging.info("Schedule data successfully scraped: %d shifts", len(schedule_data))
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Scraped schedule data: %r", schedule_data)
+    return schedule_data
+
+def _schedule_days_from_html(html):
+    """Extract the same day/shift structure as _SCHEDULE_JS from server-rendered HTML."""
+    tree = lxml.html.fromstring(html)
+    schedule_days = []
+    for day in tree.xpath(f'//li[{_has_class("withDivider")}]'):
+        shifts = []
+        for shift in day.xpath(f'.//div[{_has_class("scheduleEntityWrapper")} or {_has_class("shiftPosition")}]'):
+            time_label = shift.xpath(f'(.//p[{_has_class("props")}] | .//time[{_has_class("label")}])[1]')
+            details = shift.xpath(f'(.//p[{_has_class("label")}] | .//div[{_has_class("details")}])[1]')
+            shifts.append({
+                "time": _element_text(time_label[0]) if time_label else None,
+                "details": _element_text(details[0]) if details else None
+            })
+        schedule_days.append({"date": day.get("datetime"), "shifts": shifts})
+    return schedule_days
+
+def _fold(line):
+    """Fold a content line like icalendar does: under 75 octets, never splitting UTF-8 characters or escapes."""
+    if len(line.encode('utf-8')) < _ICS_LINE_LIMIT:
+        return line
+    parts, current, size = [], [], 0
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if current and size + char_size >= _ICS_LINE_LIMIT:
+            # Keep a backslash escape on the same line as the character it escapes
+            carry = [current.pop()] if len(current) > 1 and current[-1] == '\\' else []
+            parts.append(''.join(current))
+            current, size = carry, len(carry)
+        current.append(char)
+        size += char_size
+    parts.append(''.join(current))
+    return '\r\n '.join(parts)
+
+def _shift_datetime(date_part, clock):
+    """Build a local datetime from a split "Mon Jan 01 2024 ..." date and a "9:00 AM" clock time."""
+    hour, minute, meridiem = _CLOCK_RE.match(clock.strip()).groups()
+    hour = int(hour) % 12 + (12 if meridiem == 'PM' else 0)
+    return datetime(int(date_part[3]), _MONTHS[date_part[1]], int(date_part[2]), hour, int(minute), tzinfo=_LOCAL_TZ)
+
+def create_icalendar_event(date_str, start_time_str, end_time_str, details, shift_length=None,
+                           time_range=None, summary_style='times'):
+    """Create an iCalendar event, returning its UID, the serialized .ics text and its (dtstart, dtend, summary) key.
+
+    summary_style 'times' gives "09:00 AM - 05:30 PM: details"; 'details' keeps the summary
+    and UID scheme Radicale calendars have always used, so their existing events still match.
+    """
+    # Parse the date and times
+    date_part = date_str.split(' ')
+
+    # Assuming times are in US/Eastern timezone
+    start_time = _shift_datetime(date_part, start_time_str)
+    end_time = _shift_datetime(date_part, end_time_str)
+
+    # Derive the UID from the shift itself so re-scraped shifts keep the same UID
+    if summary_style == 'details':
+        uid_source = f"{date_str}|{time_range}|{details}"
+    else:
+        uid_source = f"{date_str}|{start_time_str}|{end_time_str}|{details}"
+    unique_uid = hashlib.blake2b(uid_source.encode('utf-8'), digest_size=16).hexdigest() + UID_DOMAIN
+    logging.debug("Generated UID: %s for event on %s", unique_uid, date_str)
+
+    # Adjust details if no details are available
+    if details == "No details available":
+        if shift_length:
+            details = f"{shift_length} hrs"
+        else:
+            details = ""
+
+    # Build the event summary
+    if summary_style == 'details':
+        event_summary = details
+    else:
+        event_summary = f"{start_time.strftime('%I:%M %p')} - {end_time.strftime('%I:%M %p')}"
+        if details:
+            event_summary += f": {details}"
+
+    logging.debug("Event summary set to: %s", event_summary)
+
+    ics_text = _ICS_TEMPLATE.format(
+        uid=unique_uid,
+        dtstamp=datetime.utcnow().strftime('%Y%m%dT%H%M%SZ'),
+        tzid=_LOCAL_TZ.key,
+        dtstart=start_time.strftime('%Y%m%dT%H%M%S'),
+        dtend=end_time.strftime('%Y%m%dT%H%M%S'),
+        summary_line=_fold(f"SUMMARY:{event_summary.translate(_ICS_ESCAPE)}")
+    )
+    return unique_uid, ics_text, (start_time, end_time, event_summary)
+
+
+def create_individual_ics_files(schedule_data, summary_style='times', debug_dump_dir=None):
+    """Generate an in-memory iCalendar (.ics) document for each event in schedule data.
+
+    Returns a list of {'uid', 'ics', 'key'} dicts, where 'ics' is the encoded document and
+    'key' is the (dtstart, dtend, summary) tuple used to match existing events. Each event
+    is later uploaded as its own resource since CalDAV only allows one UID per calendar object.
+    summary_style is passed through to create_icalendar_event. Pass debug_dump_dir to also
+    write the .ics files to disk for offline inspection.
+    """
+    ics_events = []
+    if debug_dump_dir:
+        os.makedirs(debug_dump_dir, exist_ok=True)
+
+    for entry in schedule_data:
+        try:
+            uid, ics_text, event_key = create_icalendar_event(
+                entry['date'],
+                entry['start_time'],
+                entry['end_time'],
+                entry['details'],
+                entry.get('shift_length'),  # Pass shift_length if available
+                entry.get('time_range'),
+                summary_style
+            )
+            ics_bytes = ics_text.encode('utf-8')
+            ics_events.append({'uid': uid, 'ics': ics_bytes, 'key': event_key})
+            logging.debug("Generated iCalendar event: %s", uid)
+            if debug_dump_dir:
+                with open(os.path.join(debug_dump_dir, f"{uid}.ics"), 'wb') as f:
+                    f.write(ics_bytes)
+        except Exception as e:
+            logging.error(f"Error creating iCalendar event for entry: {entry}")
+            logging.error(f"Exception: {e}")
+            logging.error(f"Full traceback: {traceback.format_exc()}")
+
+    return ics_events
+
+def _has_class(name):
+    """XPath predicate matching elements whose class list contains name."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def _inner_text_parts(element, parts):
+    """Collect an element's text runs and line-break counts in document order for _element_text."""
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in _HIDDEN_TAGS:
+            if child.tag == 'br':
+                parts.append('\n')
+            else:
+                breaks = 2 if child.tag == 'p' else 1 if child.tag in _BLOCK_TAGS else 0
+                parts.extend([breaks, child.text or ''])
+                _inner_text_parts(child, parts)
+                parts.append(breaks)
+        parts.append(child.tail or '')
+
+def _element_text(element):
+    """Approximate the browser's innerText, so the HTTP and Selenium paths produce the same shift text.
+
+    Script/style content is skipped, block elements start new lines (paragraphs a blank one),
+    and whitespace inside each line is collapsed the way CSS white-space: normal renders it.
+    """
+    parts = [element.text or '']
+    _inner_text_parts(element, parts)
+
+    out, pending = [], 0
+    for part in parts:
+        if isinstance(part, int):
+            pending = max(pending, part)  # Adjacent block boundaries share one line break
+        elif part == '\n':
+            out.append(part)
+            pending = 0
+        else:
+            text = _WHITESPACE_RE.sub(' ', part)
+            if text.strip():
+                if pending and out:
+                    out.append('\n' * pending)
+                pending = 0
+            out.append(text)
+    lines = (_WHITESPACE_RE.sub(' ', line).strip() for line in ''.join(out).split('\n'))
+    return '\n'.join(lines).strip('\n')
+
+def _save_kronos_cookies(driver):
+    """Persist the browser's Kronos session cookies so later runs can skip Selenium.
+
+    Best effort: the schedule has already been scraped, so a failure here (an unwritable cache
+    dir, or a browser that died mid-scrape) only costs the next run a login.
+    """
+    try:
+        write_private_json(KRONOS_COOKIE_FILE, driver.get_cookies())
+    except Exception as e:
+        logging.warning(f"Could not save Kronos cookies to {KRONOS_COOKIE_FILE}: {e}")
+
+def scrape_schedule_http(url, cookies=None):
+    """Fetch the schedule with plain HTTP using browser session cookies.
+
+    Uses the cookies saved by an earlier browser login unless cookies are passed in.
+    Returns None when there are no cookies, the session has expired, or the page
+    did not contain server-rendered shifts, so the caller can fall back to Selenium.
+    """
+    if cookies is None:
+        try:
+            with open(KRONOS_COOKIE_FILE, 'r') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    with requests.Session() as session:
+        for cookie in cookies:
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'))
+
+        try:
+            response = session.get(url, timeout=30)
+        except requests.RequestException as e:
+            logging.warning(f"HTTP fetch of the schedule failed: {e}")
+            return None
+
+    if response.status_code != 200 or "login.microsoftonline.com" in response.url:
+        logging.info("Kronos session was not accepted over HTTP, falling back to the browser")
+        return None
+
+    schedule_days = _schedule_days_from_html(response.content)
+    # Day rows can be server-rendered while JavaScript fills in their shifts, so require shift elements too
+    if not any(day["shifts"] for day in schedule_days):
+        logging.info("Shifts not present in the static HTML, falling back to the browser")
+        return None
+
+    logging.info(f"Fetched {len(schedule_days)} schedule days over HTTP")
+    return parse_schedule_days(schedule_days)
+
+def create_driver():
+    """Start a headless Chrome session, locally or on a Selenium Grid when SELENIUM_GRID_URL is set."""
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")  # Run Chrome in headless mode
+    options.add_argument("--no-sandbox")  # Bypass OS security model, useful in Docker
+    options.add_argument("--disable-dev-shm-usage")  # Overcome limited resource problems
+    options.add_argument("--disable-gpu")  # Disable GPU acceleration
+    options.add_argument("--window-size=1920,1080")  # Set window size to avoid rendering issues
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])  # Silence chromedriver's console logging
+    options.page_load_strategy = 'eager'  # Return at DOMContentLoaded; the explicit waits cover the rest
+
+    if SELENIUM_GRID_URL:
+        return webdriver.Remote(command_executor=SELENIUM_GRID_URL, options=options)
+
+    service = ChromeService(executable_path=CHROMEDRIVER_PATH) if CHROMEDRIVER_PATH else ChromeService()
+    return webdriver.Chrome(service=service, options=options)
+
+def _scrape_http(url, cookies=None):
+    """scrape_schedule_http that logs failures instead of raising, so one bad page can't sink the run."""
+    try:
+        return scrape_schedule_http(url, cookies)
+    except Exception as e:
+        logging.error(f"HTTP scrape of {url} failed: {e}")
+        logging.error(f"Full traceback: {traceback.format_exc()}")
+        return None
+
+def _fetch_over_http(urls, cookies=None):
+    """Fetch the schedule pages over HTTP concurrently, returning {url: schedule_data or None}."""
+    with ThreadPoolExecutor(max_workers=min(SCRAPE_WORKERS, len(urls))) as executor:
+        return dict(zip(urls, executor.map(functools.partial(_scrape_http, cookies=cookies), urls)))
+
+def scrape_with_browser(urls):
+    """Log in once in Chrome, then read each page over HTTP with that session or from the rendered DOM."""
+    driver = create_driver()
+    try:
+        # One login per run: Microsoft accepts each TOTP code only once, so parallel logins would fail
+        login_to_microsoft(driver)
+        # Chrome is only needed for the Microsoft/TOTP login; try the fresh session over plain HTTP first
+        results = _fetch_over_http(urls, driver.get_cookies())
+        for url in urls:
+            if results[url] is None:
+                results[url] = scrape_schedule(driver, url)
+        _save_kronos_cookies(driver)
+        return results
+    finally:
+        driver.quit()
+        logging.info("Browser closed")
+
+def scrape_all(urls):
+    """Scrape every schedule page and combine the results.
+
+    Saved cookies are tried first; pages that still need a login share a single browser
+    session. A page that fails is logged and skipped rather than discarding the others.
+    """
+    results = _fetch_over_http(urls)
+    pending = [url for url in urls if results[url] is None]
+    if pending:
+        try:
+            results.update(scrape_with_browser(pending))
+        except Exception as e:
+            logging.error(f"Browser scrape failed: {e}")
+            logging.error(f"Full traceback: {traceback.format_exc()}")
+    return list(itertools.chain.from_iterable(results[url] or [] for url in urls))
+
+def main(backend):
+    """Scrape every Kronos schedule page and upload the shifts missing from the backend's calendar."""
+    urls = [KRONOS_URL] + KRONOS_EXTRA_URLS
+    now = datetime.now(_LOCAL_TZ)
+
+    try:
+        # The calendar server and Kronos are independent, so fetch existing events while the browser scrapes
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            existing_future = executor.submit(
+                backend.fetch_existing,
+                start=now - timedelta(days=SYNC_WINDOW_PAST_DAYS),
+                end=now + timedelta(days=SYNC_WINDOW_FUTURE_DAYS)
+            )
+            schedule_future = executor.submit(scrape_all, urls)
+            existing_events = existing_future.result()
+            schedule_data = schedule_future.result()
+
+        # Generate new events
+        ics_events = create_individual_ics_files(schedule_data, backend.summary_style)
+
+        # Drop events that already exist on the calendar server
+        new_events = [event for event in ics_events if event['key'] not in existing_events]
+        logging.info(f"{len(ics_events) - len(new_events)} of {len(ics_events)} events already exist on {backend.name}")
+
+        # Upload new events
+        backend.upload(new_events)
+
+    except Exception as e:
+        logging.error(f"An error occurred: {e}")
+        logging.error(f"Full traceback: {traceback.format_exc()}")  # Added traceback
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the Kronos schedule into a CalDAV calendar.")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='nextcloud', help="calendar server to sync into")
+    args = parser.parse_args()
+    main(BACKENDS[args.backend]())